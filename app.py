@@ -8,6 +8,7 @@ app = Flask(__name__)
 app.secret_key = 'zrp_traffic_system_secret_key_2024'
 
 fine_service = FineManagementService()
+FINES_PER_PAGE = 50
 
 @app.route('/')
 def index():
@@ -134,54 +135,23 @@ def view_fines():
     search_value = request.args.get('search_value', '')
     status_filter = request.args.get('status_filter', 'all')
     
-    conn = fine_service.db_model.get_connection()
+    page = max(request.args.get('page', 1, type=int), 1)
     
-    query = '''
-        SELECT tf.fine_number, tf.offence_date, tf.offence_location, 
-               tf.fine_amount, tf.status, tf.due_date,
-               o.full_name, o.national_id,
-               v.registration_number,
-               u.full_name as officer_name,
-               ot.offence_description
-        FROM traffic_fines tf
-        JOIN offenders o ON tf.offender_id = o.id
-        JOIN vehicles v ON tf.vehicle_id = v.id
-        JOIN users u ON tf.officer_id = u.id
-        JOIN offence_types ot ON tf.offence_type_id = ot.id
-    '''
-    
-    conditions = []
-    params = []
-    
-    if search_value:
-        if search_type == 'fine_number':
-            conditions.append("tf.fine_number LIKE ?")
-            params.append(f"%{search_value}%")
-        elif search_type == 'national_id':
-            conditions.append("o.national_id LIKE ?")
-            params.append(f"%{search_value}%")
-        elif search_type == 'vehicle_reg':
-            conditions.append("v.registration_number LIKE ?")
-            params.append(f"%{search_value}%")
-    
-    if status_filter != 'all':
-        conditions.append("tf.status = ?")
-        params.append(status_filter)
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY tf.offence_date DESC"
-    
-    fines = conn.execute(query, params).fetchall()
-    conn.close()
+    # Fetch one extra row to know whether there is a next page
+    fines = fine_service.search_fines(search_type, search_value, status_filter,
+                                      limit=FINES_PER_PAGE + 1,
+                                      offset=(page - 1) * FINES_PER_PAGE)
+    has_next = len(fines) > FINES_PER_PAGE
+    fines = fines[:FINES_PER_PAGE]
     
     return render_template('view_fines.html', 
                          current_user=session['user'],
                          fines=fines,
                          search_type=search_type,
                          search_value=search_value,
-                         status_filter=status_filter)
+                         status_filter=status_filter,
+                         page=page,
+                         has_next=has_next)
 
 @app.route('/reports')
 def reports():
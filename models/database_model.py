@@ -6,6 +6,13 @@ import secrets
 import os
 
 class DatabaseModel:
+    CHANGE_TRACKED_TABLES = ('traffic_fines', 'offenders', 'vehicles', 'offence_types')
+    SEARCH_INDEXED_COLUMNS = {
+        'traffic_fines': ('fine_number',),
+        'offenders': ('national_id', 'full_name'),
+        'vehicles': ('registration_number',)
+    }
+    
     def __init__(self, db_path=None):
         if db_path is None:
             current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -14,6 +21,7 @@ class DatabaseModel:
         else:
             self.db_path = db_path
         
+        self.search_index_enabled = False
         self.init_database()
     
     def get_connection(self):
@@ -116,6 +124,44 @@ class DatabaseModel:
             )
         ''')
         
+        # Change log table (append-only change-data-capture feed)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                operation TEXT NOT NULL CHECK(operation IN ('insert', 'update', 'delete')),
+                row_id INTEGER NOT NULL,
+                changed_columns TEXT,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Change feed consumers table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_consumers (
+                consumer_name TEXT PRIMARY KEY,
+                last_seq INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        for table_name in self.CHANGE_TRACKED_TABLES:
+            self.create_change_triggers(cursor, table_name)
+        
+        # Indexes for joining searched offenders and vehicles back to their fines
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traffic_fines_offender_id ON traffic_fines (offender_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traffic_fines_vehicle_id ON traffic_fines (vehicle_id)')
+        
+        # Indexes for listing search results newest first, with and without a status filter
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traffic_fines_offence_date ON traffic_fines (offence_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traffic_fines_status_date ON traffic_fines (status, offence_date)')
+        
+        # Trigram search indexes, searches fall back to LIKE without FTS5
+        self.search_index_enabled = all(
+            self.create_search_index(cursor, table_name, columns)
+            for table_name, columns in self.SEARCH_INDEXED_COLUMNS.items()
+        )
+        
         # Default admin user
         default_password = self.hash_password("admin123")
         cursor.execute('''
@@ -155,6 +201,119 @@ class DatabaseModel:
         conn.commit()
         conn.close()
     
+    def create_change_triggers(self, cursor, table_name):
+        columns = [row[1] for row in cursor.execute(f'PRAGMA table_info({table_name})')]
+        all_columns = ','.join(columns)
+        changed_checks = ' OR '.join(f'OLD.{col} IS NOT NEW.{col}' for col in columns)
+        changed_list = ' || '.join(
+            f"CASE WHEN OLD.{col} IS NOT NEW.{col} THEN '{col},' ELSE '' END" for col in columns
+        )
+        
+        triggers = {
+            f'{table_name}_change_insert': f'''
+                CREATE TRIGGER {table_name}_change_insert
+                AFTER INSERT ON {table_name}
+                BEGIN
+                    INSERT INTO change_log (table_name, operation, row_id, changed_columns)
+                    VALUES ('{table_name}', 'insert', NEW.id, '{all_columns}');
+                END
+            ''',
+            f'{table_name}_change_update': f'''
+                CREATE TRIGGER {table_name}_change_update
+                AFTER UPDATE ON {table_name}
+                WHEN {changed_checks}
+                BEGIN
+                    INSERT INTO change_log (table_name, operation, row_id, changed_columns)
+                    VALUES ('{table_name}', 'update', NEW.id, rtrim({changed_list}, ','));
+                END
+            ''',
+            f'{table_name}_change_delete': f'''
+                CREATE TRIGGER {table_name}_change_delete
+                AFTER DELETE ON {table_name}
+                BEGIN
+                    INSERT INTO change_log (table_name, operation, row_id, changed_columns)
+                    VALUES ('{table_name}', 'delete', OLD.id, NULL);
+                END
+            '''
+        }
+        
+        # Column lists are baked into the triggers, so rebuild any whose stored SQL
+        # no longer matches the table. Drop and create happen in one write
+        # transaction so concurrent writers never see the table without a trigger
+        if not self.get_stale_triggers(cursor, table_name, triggers):
+            return
+        
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for trigger_name in self.get_stale_triggers(cursor, table_name, triggers):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger_name}')
+                cursor.execute(triggers[trigger_name])
+            cursor.connection.commit()
+        except Exception:
+            cursor.connection.rollback()
+            raise
+    
+    def get_stale_triggers(self, cursor, table_name, triggers):
+        stored = dict(cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+            (table_name,)
+        ).fetchall())
+        return [
+            name for name, sql in triggers.items()
+            if ' '.join((stored.get(name) or '').split()) != ' '.join(sql.split())
+        ]
+    
+    def create_search_index(self, cursor, table_name, columns):
+        index_name = f'{table_name}_search'
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'NEW.{col}' for col in columns)
+        
+        index_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index_name,)
+        ).fetchone()
+        
+        try:
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {index_name}
+                USING fts5({column_list}, tokenize='trigram')
+            ''')
+        except sqlite3.OperationalError:
+            return False
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {index_name}_insert
+            AFTER INSERT ON {table_name}
+            BEGIN
+                INSERT INTO {index_name} (rowid, {column_list}) VALUES (NEW.id, {new_values});
+            END
+        ''')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {index_name}_update
+            AFTER UPDATE OF {column_list} ON {table_name}
+            BEGIN
+                DELETE FROM {index_name} WHERE rowid = OLD.id;
+                INSERT INTO {index_name} (rowid, {column_list}) VALUES (NEW.id, {new_values});
+            END
+        ''')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {index_name}_delete
+            AFTER DELETE ON {table_name}
+            BEGIN
+                DELETE FROM {index_name} WHERE rowid = OLD.id;
+            END
+        ''')
+        
+        # Backfill rows written before the index existed
+        if not index_exists:
+            cursor.execute(f'''
+                INSERT INTO {index_name} (rowid, {column_list})
+                SELECT id, {column_list} FROM {table_name}
+            ''')
+        
+        return True
+    
     def hash_password(self, password):
         return hashlib.sha256(password.encode()).hexdigest()
     
@@ -0,0 +1,116 @@
+# services/change_feed.py
+from models.database_model import DatabaseModel
+
+class ChangeFeedService:
+    def __init__(self, db_model=None):
+        self.db_model = db_model or DatabaseModel()
+
+    def register_consumer(self, consumer_name, from_beginning=False):
+        conn = self.db_model.get_connection()
+        cursor = conn.cursor()
+
+        start_seq = 0
+        if not from_beginning:
+            start_seq = cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+
+        cursor.execute('''
+            INSERT OR IGNORE INTO change_consumers (consumer_name, last_seq)
+            VALUES (?, ?)
+        ''', (consumer_name, start_seq))
+
+        conn.commit()
+        conn.close()
+        return self.get_cursor(consumer_name)
+
+    def unregister_consumer(self, consumer_name):
+        conn = self.db_model.get_connection()
+        conn.execute('DELETE FROM change_consumers WHERE consumer_name = ?', (consumer_name,))
+        conn.commit()
+        conn.close()
+
+    def get_cursor(self, consumer_name):
+        conn = self.db_model.get_connection()
+        row = conn.execute(
+            'SELECT last_seq FROM change_consumers WHERE consumer_name = ?',
+            (consumer_name,)
+        ).fetchone()
+        conn.close()
+
+        if row is None:
+            raise ValueError(f"Unknown change feed consumer: {consumer_name}")
+        return row[0]
+
+    def get_changes(self, after_seq=0, batch_size=100, table_name=None):
+        conn = self.db_model.get_connection()
+
+        query = '''
+            SELECT seq, table_name, operation, row_id, changed_columns, changed_at
+            FROM change_log
+            WHERE seq > ?
+        '''
+        params = [after_seq]
+
+        if table_name:
+            query += " AND table_name = ?"
+            params.append(table_name)
+
+        query += " ORDER BY seq LIMIT ?"
+        params.append(batch_size)
+
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+
+        return [{
+            'seq': row[0],
+            'table_name': row[1],
+            'operation': row[2],
+            'row_id': row[3],
+            'changed_columns': row[4].split(',') if row[4] else [],
+            'changed_at': row[5]
+        } for row in rows]
+
+    def read_batch(self, consumer_name, batch_size=100):
+        return self.get_changes(self.get_cursor(consumer_name), batch_size)
+
+    def acknowledge(self, consumer_name, seq):
+        conn = self.db_model.get_connection()
+        cursor = conn.cursor()
+
+        # Cursors only move forward so a late acknowledgement cannot replay changes
+        cursor.execute('''
+            UPDATE change_consumers
+            SET last_seq = MAX(last_seq, ?), updated_at = CURRENT_TIMESTAMP
+            WHERE consumer_name = ?
+        ''', (seq, consumer_name))
+
+        updated = cursor.rowcount
+        conn.commit()
+        conn.close()
+
+        if not updated:
+            raise ValueError(f"Unknown change feed consumer: {consumer_name}")
+        return True
+
+    def tail(self, consumer_name, batch_size=100):
+        while True:
+            batch = self.read_batch(consumer_name, batch_size)
+            if not batch:
+                return
+            yield batch
+            self.acknowledge(consumer_name, batch[-1]['seq'])
+
+    def compact(self):
+        conn = self.db_model.get_connection()
+        cursor = conn.cursor()
+
+        slowest_seq = cursor.execute('SELECT MIN(last_seq) FROM change_consumers').fetchone()[0]
+        if slowest_seq is None:
+            conn.close()
+            return 0
+
+        cursor.execute('DELETE FROM change_log WHERE seq <= ?', (slowest_seq,))
+
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
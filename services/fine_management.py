@@ -1,8 +1,22 @@
 # services/fine_management.py
 from models.database_model import DatabaseModel
 from datetime import datetime, timedelta
+import math
 
 class FineManagementService:
+    # search_type -> (fine column to filter, indexed table, indexed column, LIKE fallback expression).
+    # LIKE expressions look up the joined row themselves so the planner streams fines
+    # newest first instead of building a bloom filter over the whole joined table
+    SEARCH_FIELDS = {
+        'fine_number': ('tf.id', 'traffic_fines', 'fine_number', 'tf.fine_number'),
+        'national_id': ('tf.offender_id', 'offenders', 'national_id',
+                        '(SELECT national_id FROM offenders WHERE id = tf.offender_id)'),
+        'offender_name': ('tf.offender_id', 'offenders', 'full_name',
+                          '(SELECT full_name FROM offenders WHERE id = tf.offender_id)'),
+        'vehicle_reg': ('tf.vehicle_id', 'vehicles', 'registration_number',
+                        '(SELECT registration_number FROM vehicles WHERE id = tf.vehicle_id)')
+    }
+    
     def __init__(self):
         self.db_model = DatabaseModel()
     
@@ -249,6 +263,131 @@ class FineManagementService:
         
         return report
     
+    def search_fines(self, search_type, search_value, status_filter='all', limit=50, offset=0):
+        conn = self.db_model.get_connection()
+        
+        if not search_value or search_type not in self.SEARCH_FIELDS:
+            fines = self.query_fines(conn, status_filter, limit, offset)
+        elif search_type == 'fine_number' and len(search_value) == len(self.db_model.generate_fine_number()):
+            # Fine numbers all share one length, so a full one can only equal a single fine.
+            # The UNIQUE index finds it without reading trigrams every fine number shares
+            fines = self.query_fines(conn, status_filter, limit, offset,
+                                     "tf.fine_number = ?", [search_value.upper()])
+        elif not self.db_model.search_index_enabled or len(search_value) < 3:
+            # Trigrams need at least three characters, shorter terms use LIKE
+            fines = self.query_fines(conn, status_filter, limit, offset,
+                                     *self.build_like_condition(conn, search_type, search_value))
+        else:
+            fines = self.search_fines_indexed(conn, search_type, search_value, status_filter, limit, offset)
+        
+        conn.close()
+        return fines
+    
+    def search_fines_indexed(self, conn, search_type, search_value, status_filter, limit, offset):
+        fine_column, table_name, index_column, like_column = self.SEARCH_FIELDS[search_type]
+        index_name = f'{table_name}_search'
+        phrase = search_value.replace('"', '""')
+        match_query = f'{index_column} : "{phrase}"'
+        
+        # Through the index, a search joins and sorts every matching fine. A newest-first
+        # LIKE scan instead reads about page_rows / match density fines, which is at most
+        # scan_rows = sqrt(page_rows * fines) once the term matches more than threshold
+        # rows. Both costs are then bounded by scan_rows
+        page_rows = limit + offset
+        fine_count = conn.execute('SELECT MAX(id) FROM traffic_fines').fetchone()[0] or 0
+        row_count = conn.execute(f'SELECT MAX(id) FROM {table_name}').fetchone()[0] or 0
+        scan_rows = max(int(math.sqrt(page_rows * fine_count)), 1)
+        threshold = max(row_count * scan_rows // max(fine_count, 1), 1)
+        
+        # One MATCH serves as both the breadth probe and the result set
+        match_count, match_ids = conn.execute(f'''
+            SELECT COUNT(*), json_group_array(rowid) FROM (
+                SELECT rowid FROM {index_name} WHERE {index_name} MATCH ? LIMIT ?
+            )
+        ''', (match_query, threshold)).fetchone()
+        
+        if match_count >= threshold:
+            # Broad term: scan the newest scan_rows fines with the requested status, and
+            # only if their matches do not fill the page (matches clustered in older
+            # fines) fall back to the index
+            if status_filter != 'all':
+                cutoff = conn.execute('''
+                    SELECT offence_date FROM traffic_fines WHERE status = ?
+                    ORDER BY offence_date DESC LIMIT 1 OFFSET ?
+                ''', (status_filter, scan_rows - 1)).fetchone()
+            else:
+                cutoff = conn.execute(
+                    'SELECT offence_date FROM traffic_fines ORDER BY offence_date DESC LIMIT 1 OFFSET ?',
+                    (scan_rows - 1,)
+                ).fetchone()
+            condition, params = self.build_like_condition(conn, search_type, search_value)
+            if cutoff:
+                condition += " AND tf.offence_date >= ?"
+                params = params + [cutoff[0]]
+            fines = self.query_fines(conn, status_filter, limit, offset, condition, params)
+            if len(fines) == limit or not cutoff:
+                return fines
+            source = f"(SELECT rowid AS id FROM {index_name} WHERE {index_name} MATCH ?)"
+            source_param = match_query
+        else:
+            source = "(SELECT value AS id FROM json_each(?))"
+            source_param = match_ids
+        
+        # CROSS JOIN keeps the index matches as the outer loop, so a status filter
+        # cannot make the planner walk every fine with that status
+        return self.query_fines(conn, status_filter, limit, offset,
+                                source=f"{source} search_match CROSS JOIN traffic_fines tf "
+                                       f"ON {fine_column} = search_match.id",
+                                source_params=[source_param])
+    
+    def build_like_condition(self, conn, search_type, search_value):
+        like_column = self.SEARCH_FIELDS[search_type][3]
+        
+        # Match the index: wildcards are literal, and case is folded for
+        # all of Unicode, whereas LIKE only folds ASCII
+        pattern = search_value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        if search_value.isascii():
+            return f"{like_column} LIKE ? ESCAPE '\\'", [f"%{pattern}%"]
+        
+        conn.create_function('fold_case', 1, lambda value: value.lower() if value else value,
+                             deterministic=True)
+        return f"fold_case({like_column}) LIKE ? ESCAPE '\\'", [f"%{pattern.lower()}%"]
+    
+    def query_fines(self, conn, status_filter, limit, offset, condition=None, params=None,
+                    source="traffic_fines tf", source_params=None):
+        query = f'''
+            SELECT tf.fine_number, tf.offence_date, tf.offence_location, 
+                   tf.fine_amount, tf.status, tf.due_date,
+                   o.full_name, o.national_id,
+                   v.registration_number,
+                   u.full_name as officer_name,
+                   ot.offence_description
+            FROM {source}
+            JOIN offenders o ON tf.offender_id = o.id
+            JOIN vehicles v ON tf.vehicle_id = v.id
+            JOIN users u ON tf.officer_id = u.id
+            JOIN offence_types ot ON tf.offence_type_id = ot.id
+        '''
+        
+        conditions = []
+        query_params = list(source_params or [])
+        
+        if condition:
+            conditions.append(condition)
+            query_params.extend(params)
+        
+        if status_filter != 'all':
+            conditions.append("tf.status = ?")
+            query_params.append(status_filter)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        query += " ORDER BY tf.offence_date DESC LIMIT ? OFFSET ?"
+        query_params.extend([limit, offset])
+        
+        return conn.execute(query, query_params).fetchall()
+    
     def get_offence_types(self):
         conn = self.db_model.get_connection()
         offence_types = conn.execute(
@@ -261,12 +400,20 @@ class FineManagementService:
         conn = self.db_model.get_connection()
         cursor = conn.cursor()
         
+        # Upsert keeps the offender's id so existing fines stay linked and
+        # the change is logged as an update rather than an untracked delete
         cursor.execute('''
-            INSERT OR REPLACE INTO offenders (national_id, full_name, email, phone_number)
+            INSERT INTO offenders (national_id, full_name, email, phone_number)
             VALUES (?, ?, ?, ?)
+            ON CONFLICT(national_id) DO UPDATE SET
+                full_name = excluded.full_name,
+                email = excluded.email,
+                phone_number = excluded.phone_number
         ''', (national_id, full_name, email, phone_number))
         
-        offender_id = cursor.lastrowid
+        offender_id = cursor.execute(
+            'SELECT id FROM offenders WHERE national_id = ?', (national_id,)
+        ).fetchone()[0]
         conn.commit()
         conn.close()
         return offender_id
@@ -276,11 +423,18 @@ class FineManagementService:
         cursor = conn.cursor()
         
         cursor.execute('''
-            INSERT OR REPLACE INTO vehicles (registration_number, make, model, color, owner_id)
+            INSERT INTO vehicles (registration_number, make, model, color, owner_id)
             VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(registration_number) DO UPDATE SET
+                make = excluded.make,
+                model = excluded.model,
+                color = excluded.color,
+                owner_id = excluded.owner_id
         ''', (registration_number, make, model, color, owner_id))
         
-        vehicle_id = cursor.lastrowid
+        vehicle_id = cursor.execute(
+            'SELECT id FROM vehicles WHERE registration_number = ?', (registration_number,)
+        ).fetchone()[0]
         conn.commit()
         conn.close()
         return vehicle_id